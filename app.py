@@ -1,18 +1,24 @@
 from flask import Flask, request, render_template_string
 import requests
-from bs4 import BeautifulSoup
-import firebase_admin
-from firebase_admin import credentials, firestore
 import time
-import re
-from datetime import datetime
+from backfill import mark_pending
+from parsers import extract_last_date_from_text
+from site_registry import load_sites
+from storage import SERVER_TIMESTAMP, job_doc_id, open_storage
 
 app = Flask(__name__)
 
-# Firebase setup
-cred = credentials.Certificate('pasra-firebase.json')
-firebase_admin.initialize_app(cred)
-db = firestore.client()
+# Firebase setup - lazy, pehli baar "Save" dabane pe hi load hoga
+# ("Find Today Jobs" ke liye Firebase ki zaroorat hi nahi, Flask startup fast rehta hai)
+def initialize_firebase():
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+
+    cred = credentials.Certificate('pasra-firebase.json')
+    firebase_admin.initialize_app(cred)
+    return firestore.client()
+
+store = open_storage(initialize_firebase)
 
 # States with keywords
 STATES = {
@@ -31,160 +37,17 @@ def get_state_from_title(title):
             return state_key
     return 'all'
 
-# ======================
-# DATE EXTRACTION HELPERS
-# ======================
-
-def parse_date_str(date_str):
-    """Try to parse date string in common Indian formats"""
-    formats = [
-        '%d.%m.%Y', '%d-%m-%Y', '%d/%m/%Y',
-        '%d.%m.%y', '%d-%m-%y', '%d/%m/%y',
-        '%d %b %Y', '%d %B %Y', '%d %b, %Y', '%d %B, %Y'
-    ]
-    for fmt in formats:
-        try:
-            dt = datetime.strptime(date_str, fmt)
-            if dt.year < 2000:  # Assume 20xx for two-digit years
-                dt = dt.replace(year=dt.year + 2000)
-            return dt
-        except ValueError:
-            continue
-    return None
-
-def extract_last_date_from_text(text):
-    """Regex to find last date in text (title or page content)"""
-    patterns = [
-        r'(?:Last Date|Closing Date|Application Last Date|Last Date for Apply|Deadline|Last Date to Apply)[\s:.-]*(\d{1,2}[./-]\d{1,2}[./-]\d{2,4})',
-        r'(?:Last Date|Closing Date)[\s:.-]*(\d{1,2}\s+[A-Za-z]+\s+\d{4})',
-        r'(\d{1,2}[./-]\d{1,2}[./-]\d{2,4})'  # fallback any date-like
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            date_str = match.group(1).strip()
-            dt = parse_date_str(date_str)
-            if dt:
-                return dt
-    return None
-
-def get_last_date_from_detail_page(link):
-    """Scrape detail page for last date (fallback)"""
-    if not link or 'http' not in link:
-        return None
-    try:
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-        response = requests.get(link, headers=headers, timeout=12)
-        if response.status_code != 200:
-            return None
-        soup = BeautifulSoup(response.text, 'html.parser')
+# Sites list - sites.json (site_registry) se, parsing wahi ke matchers karte hain
+SITES = load_sites()
 
-        full_text = soup.get_text(separator=' ', strip=True)
-        dt = extract_last_date_from_text(full_text)
-        if dt:
-            return dt
-
-        important_section = soup.find(string=re.compile(r'(important dates|dates|important links)', re.I))
-        if important_section:
-            parent = important_section.find_parent(['div', 'table', 'p', 'section'])
-            if parent:
-                section_text = parent.get_text(separator=' ', strip=True)
-                dt = extract_last_date_from_text(section_text)
-                if dt:
-                    return dt
-        return None
-    except Exception as e:
-        print(f"Detail page error for {link}: {e}")
-        return None
-
-# ======================
-# PARSER FUNCTIONS
-# ======================
-
-def parse_indgovtjobs(soup, site_name):
-    jobs = []
-    heading = soup.find(lambda tag: tag.name in ['h2', 'h3'] and 'Latest Government Jobs' in tag.get_text(strip=True))
-    if heading:
-        ul = heading.find_next('ul')
-        if ul:
-            for li in ul.find_all('li'):
-                a = li.find('a')
-                if a:
-                    title = a.text.strip()
-                    link = a['href']
-                    if not link.startswith('http'):
-                        link = "https://www.indgovtjobs.in" + link
-                    if len(title) > 15:
-                        jobs.append({'title': title, 'link': link, 'site': site_name})
-    return jobs
-
-def parse_sarkariresult(soup, site_name):
-    jobs = []
-    links = soup.find_all('a', href=True)
-    for a in links:
-        title = a.text.strip()
-        if any(word in title.lower() for word in ['form', 'recruitment', 'notification', '2026', 'vacancy']):
-            link = a['href']
-            if not link.startswith('http'):
-                link = "https://www.sarkariresult.com" + link
-            if len(title) > 15:
-                jobs.append({'title': title, 'link': link, 'site': site_name})
-    return jobs[:20]
-
-def parse_freejobalert(soup, site_name):
-    jobs = []
-    links = soup.find_all('a', href=True)
-    for a in links:
-        title = a.text.strip()
-        if any(word in title.lower() for word in ['form', 'recruitment', '2026', 'jobs', 'vacancy']):
-            link = a['href']
-            if not link.startswith('http'):
-                link = "https://www.freejobalert.com" + link
-            if len(title) > 15:
-                jobs.append({'title': title, 'link': link, 'site': site_name})
-    return jobs[:20]
-
-def parse_linkingsky(soup, site_name):
-    jobs = []
-    headings = soup.find_all('h2', class_='entry-title')
-    for h in headings:
-        a = h.find('a')
-        if a:
-            title = a.text.strip()
-            link = a['href']
-            if len(title) > 15:
-                jobs.append({'title': title, 'link': link, 'site': site_name})
-    return jobs
-
-def parse_odishagovtjob(soup, site_name):
-    jobs = []
-    post_titles = soup.find_all(['h3', 'h2'], class_=['post-title', 'entry-title'])
-    for title_tag in post_titles:
-        a = title_tag.find('a')
-        if a:
-            title = a.text.strip()
-            link = a['href']
-            if len(title) > 15 and any(word in title.lower() for word in ['recruitment', 'job', 'notification', '2026', 'ossc', 'odisha']):
-                jobs.append({'title': title, 'link': link, 'site': site_name})
-    return jobs[:20]
-
-SITES = [
-    {"url": "https://www.indgovtjobs.in/", "name": "IndGovtJobs", "parser": parse_indgovtjobs},
-    {"url": "https://www.sarkariresult.com/", "name": "SarkariResult", "parser": parse_sarkariresult},
-    {"url": "https://www.freejobalert.com/", "name": "FreeJobAlert", "parser": parse_freejobalert},
-    {"url": "https://linkingsky.com/", "name": "LinkingSky", "parser": parse_linkingsky},
-    {"url": "https://odishagovtjob.in/", "name": "OdishaGovtJob", "parser": parse_odishagovtjob},
-]
-
-def scrape_from_site(url, site_name, parser_func):
+def scrape_from_site(site):
     headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
     try:
-        response = requests.get(url, headers=headers, timeout=15)
+        response = requests.get(site.fetch_url, headers=headers, timeout=15)
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
-        return parser_func(soup, site_name)
+        return site.parse(response.content)
     except Exception as e:
-        print(f"Scrape error for {site_name}: {e}")
+        print(f"Scrape error for {site.name}: {e}")
         return []
 
 # ======================
@@ -203,46 +66,46 @@ def index():
         if action == 'find_jobs':
             for site in SITES:
                 time.sleep(3)  # Polite delay
-                site_jobs = scrape_from_site(site['url'], site['name'], site['parser'])
+                site_jobs = scrape_from_site(site)
                 jobs.extend(site_jobs)
             message = f"Found {len(jobs)} jobs from multiple sites!"
 
         elif action == 'save_jobs':
             for site in SITES:
                 time.sleep(3)
-                site_jobs = scrape_from_site(site['url'], site['name'], site['parser'])
+                site_jobs = scrape_from_site(site)
+
+                # State-wise group, har collection ke liye ek bulk duplicate check + ek bulk write
+                by_collection = {}
                 for job in site_jobs:
                     title = job['title']
                     link = job['link']
-                    site_name = job['site']
                     state = get_state_from_title(title)
-                    collection = f'govt_jobs_{state}'
-
-                    # Duplicate check (positional arguments warning ignore kar sakte ho ya FieldFilter use kar sakte ho future mein)
-                    query = db.collection(collection).where('title', '==', title).where('link', '==', link).limit(1).stream()
-                    if any(True for _ in query):
-                        duplicates += 1
-                        continue
-
-                    # Extract last date
-                    last_date_dt = extract_last_date_from_text(title)
-                    if not last_date_dt:
-                        print(f"Trying detail page for: {title}")
-                        last_date_dt = get_last_date_from_detail_page(link)
-
-                    data = {
+                    by_collection.setdefault(f'govt_jobs_{state}', {})[job_doc_id(title, link)] = {
                         'title': title,
                         'link': link,
                         'state': state,
-                        'site': site_name,
-                        'scraped_at': firestore.SERVER_TIMESTAMP,
+                        'site': job['site'],
+                        'scraped_at': SERVER_TIMESTAMP,
                     }
-                    if last_date_dt:
-                        data['lastDate'] = last_date_dt  # Direct datetime – Firestore auto Timestamp banayega
-                        print(f"Saved lastDate for '{title}': {last_date_dt.strftime('%d-%m-%Y')}")
 
-                    db.collection(collection).add(data)
-                    saved_count += 1
+                for collection, docs in by_collection.items():
+                    existing = store.bulk_exists(collection, docs, legacy_match=True)
+                    duplicates += len(existing)
+                    new_docs = {doc_id: data for doc_id, data in docs.items() if doc_id not in existing}
+
+                    for data in new_docs.values():
+                        title = data['title']
+                        # Extract last date - title mein nahi mili to backfill.py detail page se bharega
+                        last_date_dt = extract_last_date_from_text(title)
+                        if last_date_dt:
+                            data['lastDate'] = last_date_dt  # Direct datetime – Firestore auto Timestamp banayega
+                            print(f"Saved lastDate for '{title}': {last_date_dt.strftime('%d-%m-%Y')}")
+                        else:
+                            mark_pending(data)
+
+                    if new_docs:
+                        saved_count += store.bulk_upsert(collection, new_docs)
 
             message = f"Saved {saved_count} new jobs! Skipped {duplicates} duplicates."
 
@@ -3,16 +3,21 @@
 # Daily auto run ke liye best - no server needed
 # Requirements: pip install requests beautifulsoup4 firebase-admin
 
-import requests
-from bs4 import BeautifulSoup
-import firebase_admin
-from firebase_admin import credentials, firestore
-import time
-import re
-from datetime import datetime
+import argparse
 import logging
 import json
 import os
+import socket
+from collections import Counter
+from functools import partial
+from backfill import mark_pending
+from budget import CircuitBreaker, RunBudget
+from parse_pool import DEFERRED, NOT_MODIFIED, ParsePool
+from parsers import extract_last_date_from_text, parse_listing
+from pipeline import chain, dedupe, write
+from retention import sweep_expired_jobs
+from site_registry import FeedSite, load_sites, parse_shard, shard_sites
+from storage import SERVER_TIMESTAMP, FirestoreStorage, job_doc_id, open_storage
 
 # Logging setup (console + file mein bhi save hoga)
 logging.basicConfig(
@@ -25,11 +30,16 @@ logging.basicConfig(
 )
 
 # Firebase setup - Environment se load kar raha hai (Render ke liye perfect)
+# Import bhi yahin andar hai - dry run / sqlite mode mein firebase_admin load hi nahi hota
 def initialize_firebase():
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+
+    # Init ab pipeline thread mein bhi ho sakta hai, isliye exit() nahi - error upar tak jaane do
     cred_json = os.environ.get('GOOGLE_APPLICATION_CREDENTIALS')
     if cred_json is None:
         logging.error("GOOGLE_APPLICATION_CREDENTIALS env variable nahi mila!")
-        exit(1)
+        raise RuntimeError("GOOGLE_APPLICATION_CREDENTIALS not set")
 
     try:
         cred_dict = json.loads(cred_json)
@@ -39,9 +49,10 @@ def initialize_firebase():
         return firestore.client()
     except Exception as e:
         logging.error(f"Firebase init fail: {e}")
-        exit(1)
+        raise
 
-db = initialize_firebase()
+# Lazy - Firebase pehle Firestore call pe init hoga, PASRA_STORAGE=sqlite/dry-run mein kabhi nahi
+store = open_storage(initialize_firebase)
 
 # States keywords
 STATES = {
@@ -53,14 +64,15 @@ STATES = {
     'all': []
 }
 
-# Sites list
-SITES = [
-    {"url": "https://www.indgovtjobs.in/", "name": "IndGovtJobs"},
-    {"url": "https://www.sarkariresult.com/", "name": "SarkariResult"},
-    {"url": "https://www.freejobalert.com/", "name": "FreeJobAlert"},
-    {"url": "https://linkingsky.com/", "name": "LinkingSky"},
-    {"url": "https://odishagovtjob.in/", "name": "OdishaGovtJob"},
-]
+# Sites list - sites.json (site_registry) se
+SITES = load_sites()
+
+# Per-site lease: do workers ek hi site ek saath scrape na karein
+WORKER_ID = f"{socket.gethostname()}-{os.getpid()}"
+LEASE_TTL_SECONDS = int(os.getenv('SITE_LEASE_TTL_SECONDS', '1800'))
+
+# Feed sites ka state: ETag / Last-Modified (conditional GET) + sabse naya pubDate jo ingest ho chuka
+FEED_STATE_COLLECTION = 'scrape_feed_state'
 
 def get_state_from_title(title):
     title_lower = title.lower()
@@ -69,172 +81,149 @@ def get_state_from_title(title):
             return state_key
     return 'all'
 
-def parse_date_str(date_str):
-    formats = [
-        '%d.%m.%Y', '%d-%m-%Y', '%d/%m/%Y',
-        '%d.%m.%y', '%d-%m-%y', '%d/%m/%y',
-        '%d %b %Y', '%d %B %Y', '%d %b, %Y', '%d %B, %Y'
-    ]
-    for fmt in formats:
-        try:
-            dt = datetime.strptime(date_str, fmt)
-            if dt.year < 2000:
-                dt = dt.replace(year=dt.year + 2000)
-            return dt
-        except ValueError:
+LISTING_HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
+
+def conditional_headers(state):
+    headers = {}
+    if state.get('etag'):
+        headers['If-None-Match'] = state['etag']
+    if state.get('last_modified'):
+        headers['If-Modified-Since'] = state['last_modified']
+    return headers
+
+def save_feed_state(sites, validators, parsed):
+    """Persist validators + newest pubDate per feed; called only after the run's writes went through.
+    `parsed` has only feeds that parsed fine - 304 / deferred / broken feed ka purana state hi rehta hai"""
+    updates = {}
+    for site in sites:
+        if not isinstance(site, FeedSite) or site.name not in parsed:
             continue
-    return None
-
-def extract_last_date_from_text(text):
-    patterns = [
-        r'(?:Last Date|Closing Date|Application Last Date|Last Date for Apply|Deadline|Last Date to Apply)[\s:.-]*(\d{1,2}[./-]\d{1,2}[./-]\d{2,4})',
-        r'(?:Last Date|Closing Date)[\s:.-]*(\d{1,2}\s+[A-Za-z]+\s+\d{4})',
-        r'(\d{1,2}[./-]\d{1,2}[./-]\d{2,4})'
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            date_str = match.group(1).strip()
-            dt = parse_date_str(date_str)
-            if dt:
-                return dt
-    return None
-
-def get_last_date_from_detail_page(link):
-    if not link or 'http' not in link:
-        return None
-    try:
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(link, headers=headers, timeout=12)
-        if response.status_code != 200:
-            return None
-        soup = BeautifulSoup(response.text, 'html.parser')
-        full_text = soup.get_text(separator=' ', strip=True)
-        dt = extract_last_date_from_text(full_text)
-        if dt:
-            return dt
-        return None
-    except Exception as e:
-        logging.error(f"Detail page error for {link}: {e}")
-        return None
+        doc = dict(validators.get(site.name, {}))
+        if parsed[site.name]:
+            doc['last_pub_date'] = parsed[site.name].isoformat()
+        if doc:
+            updates[site.name] = doc
+    if updates:
+        store.bulk_upsert(FEED_STATE_COLLECTION, updates)
+
+# ================== PIPELINE STAGES ==================
+# fetch -> parse -> classify -> dedupe -> enrich -> write (pipeline.chain se jude hue)
+
+def claim_sites(sites, claimed):
+    """Yield only sites whose lease this worker got; claimed ones are collected for release"""
+    for site in sites:
+        if store.acquire_lease(site.name, WORKER_ID, LEASE_TTL_SECONDS):
+            claimed.append(site)
+            yield site
+        else:
+            logging.info(f"Skipping {site.name}: leased by another worker")
+
+def fetch_listings(pool, sites, feed_state, validators):
+    """Fetch stage: raw listing page / feed bytes, a few sites in flight at a time.
+    Feeds conditional GET se aate hain, saath mein last ingested pubDate (incremental parse)"""
+    def tasks():
+        for site in sites:
+            if isinstance(site, FeedSite):
+                state = feed_state.get(site.name, {})
+                yield site.name, site.fetch_url, (site, state.get('last_pub_date')), conditional_headers(state)
+            else:
+                yield site.name, site.fetch_url, (site,)
+
+    yield from pool.fetch_stream(tasks(), LISTING_HEADERS, timeout=15, validators=validators)
+
+def parse_jobs(fetched, pool, stats, parsed):
+    """Parse stage: listing HTML / feed XML -> job dicts in the process pool (tree main process mein kabhi nahi aata).
+    Records {site_name: newest pubDate or None} in `parsed` for every site that parsed fine"""
+    for site_name, site_jobs in pool.parse_stream(fetched, parse_listing):
+        if site_jobs == DEFERRED:
+            logging.warning(f"Skipped {site_name}: run budget over or host circuit open")
+            continue
+        if site_jobs == NOT_MODIFIED:
+            logging.info(f"{site_name}: feed not modified since last run")
+            continue
+        if site_jobs is None:
+            logging.warning(f"No jobs from {site_name}: fetch or parse failed")
+            continue
+        logging.info(f"Found {len(site_jobs)} jobs from {site_name}")
+        stats['found'] += len(site_jobs)
+        published = [job['published'] for job in site_jobs if job.get('published')]
+        parsed[site_name] = max(published) if published else None
+        yield from site_jobs
+
+def classify(jobs):
+    for job in jobs:
+        title = job['title']
+        link = job['link']
+        state = get_state_from_title(title)
+        data = {
+            'title': title,
+            'link': link,
+            'state': state,
+            'site': job['site'],
+            'scraped_at': SERVER_TIMESTAMP,
+        }
+        if job.get('lastDate'):  # feed ki post body se
+            data['lastDate'] = job['lastDate']
+        yield {'collection': f'govt_jobs_{state}', 'doc_id': job_doc_id(title, link), 'data': data}
+
+def enrich(items):
+    """Add lastDate from the title; if neither title nor feed body had one, mark the job
+    pending for backfill.py (detail pages ingestion ke critical path pe nahi hain)"""
+    for item in items:
+        data = item['data']
+        last_date_dt = extract_last_date_from_text(data['title'])
+        if last_date_dt:
+            data['lastDate'] = last_date_dt
+        elif 'lastDate' not in data:
+            mark_pending(data)
+        yield item
+
+def auto_scrape_and_save(sites=None):
+    logging.info("Starting auto scrape and save")
+    sites = SITES if sites is None else sites
+    stats = Counter()
+    claimed = []
+    validators, parsed = {}, {}
 
-def scrape_from_site(url, site_name):
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
     try:
-        response = requests.get(url, headers=headers, timeout=15)
-        if response.status_code != 200:
-            logging.warning(f"{site_name} returned {response.status_code}")
-            return []
-        soup = BeautifulSoup(response.text, 'html.parser')
-        jobs = []
-
-        if site_name == "IndGovtJobs":
-            heading = soup.find(lambda tag: tag.name in ['h2', 'h3'] and 'Latest Government Jobs' in tag.get_text(strip=True))
-            if heading:
-                ul = heading.find_next('ul')
-                if ul:
-                    for li in ul.find_all('li'):
-                        a = li.find('a')
-                        if a:
-                            title = a.text.strip()
-                            link = a['href']
-                            if not link.startswith('http'):
-                                link = "https://www.indgovtjobs.in" + link
-                            if len(title) > 15:
-                                jobs.append({'title': title, 'link': link, 'site': site_name})
-
-        elif site_name == "SarkariResult":
-            links = soup.find_all('a', href=True)
-            for a in links:
-                title = a.text.strip()
-                if any(word in title.lower() for word in ['form', 'recruitment', 'notification', '2026', 'vacancy']):
-                    link = a['href']
-                    if not link.startswith('http'):
-                        link = "https://www.sarkariresult.com" + link
-                    if len(title) > 15:
-                        jobs.append({'title': title, 'link': link, 'site': site_name})
-            jobs = jobs[:20]
-
-        elif site_name == "FreeJobAlert":
-            links = soup.find_all('a', href=True)
-            for a in links:
-                title = a.text.strip()
-                if any(word in title.lower() for word in ['form', 'recruitment', '2026', 'jobs', 'vacancy']):
-                    link = a['href']
-                    if not link.startswith('http'):
-                        link = "https://www.freejobalert.com" + link
-                    if len(title) > 15:
-                        jobs.append({'title': title, 'link': link, 'site': site_name})
-            jobs = jobs[:20]
-
-        elif site_name == "LinkingSky":
-            headings = soup.find_all('h2', class_='entry-title')
-            for h in headings:
-                a = h.find('a')
-                if a:
-                    title = a.text.strip()
-                    link = a['href']
-                    if len(title) > 15:
-                        jobs.append({'title': title, 'link': link, 'site': site_name})
-
-        elif site_name == "OdishaGovtJob":
-            post_titles = soup.find_all(['h3', 'h2'], class_=['post-title', 'entry-title'])
-            for title_tag in post_titles:
-                a = title_tag.find('a')
-                if a:
-                    title = a.text.strip()
-                    link = a['href']
-                    if len(title) > 15 and any(word in title.lower() for word in ['recruitment', 'job', 'notification', '2026', 'ossc', 'odisha']):
-                        jobs.append({'title': title, 'link': link, 'site': site_name})
-            jobs = jobs[:20]
-
-        return jobs
-    except Exception as e:
-        logging.error(f"Scrape error for {site_name}: {e}")
-        return []
-
-def auto_scrape_and_save():
-    logging.info("Starting auto scrape and save")
-    saved_count = 0
-    duplicates = 0
-
-    for site in SITES:
-        time.sleep(3)  # polite delay to avoid rate limit
-        site_jobs = scrape_from_site(site['url'], site['name'])
-        logging.info(f"Found {len(site_jobs)} jobs from {site['name']}")
-
-        for job in site_jobs:
-            title = job['title']
-            link = job['link']
-            site_name = job['site']
-            state = get_state_from_title(title)
-            collection = f'govt_jobs_{state}'
-
-            # Duplicate check
-            query = db.collection(collection).where('title', '==', title).where('link', '==', link).limit(1).get()
-            if query:
-                duplicates += 1
-                continue
-
-            last_date_dt = extract_last_date_from_text(title)
-            if not last_date_dt:
-                last_date_dt = get_last_date_from_detail_page(link)
-
-            data = {
-                'title': title,
-                'link': link,
-                'state': state,
-                'site': site_name,
-                'scraped_at': firestore.SERVER_TIMESTAMP,
-            }
-            if last_date_dt:
-                data['lastDate'] = last_date_dt
-
-            db.collection(collection).add(data)
-            saved_count += 1
-            logging.info(f"Saved: {title[:50]}...")
-
-    logging.info(f"Completed: Saved {saved_count} new jobs, Skipped {duplicates} duplicates")
+        # Ek slow host poora run na rok sake: run deadline + per-host circuit breaker
+        with ParsePool(budget=RunBudget(), breaker=CircuitBreaker()) as pool:
+            # Pool ke workers fork ho chuke, ab Firestore (gRPC threads) chhoo sakte hain
+            feed_state = store.fetch(FEED_STATE_COLLECTION) if any(isinstance(site, FeedSite) for site in sites) else {}
+            stream = chain(
+                fetch_listings(pool, claim_sites(sites, claimed), feed_state, validators),
+                partial(parse_jobs, pool=pool, stats=stats, parsed=parsed),
+                classify,
+                partial(dedupe, store=store, stats=stats),
+                enrich,
+                partial(write, store=store, stats=stats),
+            )
+            for item in stream:
+                logging.info(f"Saved: {item['data']['title'][:50]}...")
+        # Sab likh diya gaya, tabhi feed state aage badhao - warna agla run 304 pe items kho dega
+        save_feed_state(claimed, validators, parsed)
+    finally:
+        for site in claimed:
+            store.release_lease(site.name, WORKER_ID)
+
+    logging.info(f"Completed: Saved {stats['saved']} new jobs, Skipped {stats['duplicates']} duplicates")
 
 if __name__ == "__main__":
-    auto_scrape_and_save()
+    parser = argparse.ArgumentParser(description="PASRA govt jobs scraper")
+    parser.add_argument('--shard', type=parse_shard, metavar='i/N',
+                        help="Sirf is worker ke hisse ki sites scrape karo (1-based, e.g. 2/4)")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Sirf find + parse, kuch save nahi (Firebase import bhi nahi hoga)")
+    args = parser.parse_args()
+    if args.dry_run:
+        store = open_storage(initialize_firebase, backend='dry-run')
+
+    sites = SITES
+    if args.shard:
+        sites = shard_sites(SITES, *args.shard)
+        logging.info(f"Shard {args.shard[0]}/{args.shard[1]}: {len(sites)} of {len(SITES)} sites")
+
+    auto_scrape_and_save(sites)
+    # Scrape ho gaya, ab expired jobs ki safai (time budget ke andar) - sirf pehla shard karega
+    if isinstance(store, FirestoreStorage) and (not args.shard or args.shard[0] == 1):
+        sweep_expired_jobs(store.db, [f'govt_jobs_{state}' for state in STATES])
\ No newline at end of file
@@ -0,0 +1,124 @@
+# backfill.py
+# lastDate backfill - ingestion se alag pass
+# Ingest jobs ko turant likh deta hai; jinke title mein date nahi thi unpe enrichment='pending' lagta hai.
+# Yeh pass pending docs dhundta hai, detail pages parallel batches mein fetch + parse karta hai
+# aur batched writes se lastDate update karta hai. Retry limit ke baad 'failed'.
+#   BACKFILL_BUDGET_SECONDS  - is pass ka deadline (default 600)
+#   BACKFILL_BATCH_SIZE      - ek batch mein kitne detail pages (default 50)
+#   BACKFILL_MAX_ATTEMPTS    - itni baar date na mile to 'failed' (default 3)
+
+import heapq
+import itertools
+import logging
+import os
+from collections import Counter, defaultdict
+
+from budget import CircuitBreaker, RunBudget
+from parse_pool import DEFERRED, ParsePool
+from parsers import parse_detail_date
+
+BACKFILL_BUDGET_SECONDS = float(os.getenv('BACKFILL_BUDGET_SECONDS', '600'))
+BACKFILL_BATCH_SIZE = int(os.getenv('BACKFILL_BATCH_SIZE', '50'))
+BACKFILL_MAX_ATTEMPTS = int(os.getenv('BACKFILL_MAX_ATTEMPTS', '3'))
+SCAN_LIMIT = 500  # per collection per run
+
+ENRICHMENT_PENDING = 'pending'
+ENRICHMENT_DONE = 'done'
+ENRICHMENT_FAILED = 'failed'
+
+# Har site ke detail pages se kitni baar date mili - priority isi se banti hai
+SITE_STATS_COLLECTION = 'scrape_site_stats'
+
+DETAIL_HEADERS = {'User-Agent': 'Mozilla/5.0'}
+
+logger = logging.getLogger(__name__)
+
+
+def mark_pending(data):
+    """Flag a job doc for the backfill pass (title had no last date)"""
+    data['enrichment'] = ENRICHMENT_PENDING
+    data['enrichment_attempts'] = 0
+
+
+def detail_priority(data, site_stats):
+    """Higher = fetch first: sites whose detail pages usually have a date, fewer failed attempts"""
+    seen = site_stats.get(data.get('site'), {})
+    hit_rate = (seen.get('detail_hits', 0) + 1) / (seen.get('detail_tries', 0) + 2)
+    return hit_rate - 0.1 * data.get('enrichment_attempts', 0)
+
+
+def _save_site_stats(store, site_stats, detail_stats):
+    updated = {}
+    for site_name, counts in detail_stats.items():
+        previous = site_stats.get(site_name, {})
+        updated[site_name] = {
+            'detail_tries': previous.get('detail_tries', 0) + counts['detail_tries'],
+            'detail_hits': previous.get('detail_hits', 0) + counts['detail_hits'],
+        }
+    if updated:
+        store.bulk_upsert(SITE_STATS_COLLECTION, updated)
+
+
+def backfill_last_dates(store, collections, pool):
+    """Fill lastDate for pending docs in `collections`; returns a Counter of outcomes"""
+    stats = Counter()
+    site_stats = store.fetch(SITE_STATS_COLLECTION)
+    detail_stats = defaultdict(Counter)
+
+    queue = []
+    order = itertools.count()
+    bad_links = defaultdict(dict)
+    for collection in collections:
+        pending = store.fetch(collection, limit=SCAN_LIMIT, where=('enrichment', ENRICHMENT_PENDING))
+        for doc_id, data in pending.items():
+            link = data.get('link')
+            if link and 'http' in link:
+                heapq.heappush(queue, (-detail_priority(data, site_stats), next(order), collection, doc_id, data))
+            else:
+                bad_links[collection][doc_id] = {'enrichment': ENRICHMENT_FAILED}
+                stats['failed'] += 1
+    for collection, docs in bad_links.items():
+        store.bulk_upsert(collection, docs)
+
+    while queue and not pool.budget.expired():
+        batch = [heapq.heappop(queue)[2:] for _ in range(min(BACKFILL_BATCH_SIZE, len(queue)))]
+        tasks = [(job, job[2]['link'], ()) for job in batch]
+        updates = defaultdict(dict)
+
+        for (collection, doc_id, data), result in pool.fetch_and_parse(tasks, parse_detail_date, DETAIL_HEADERS, timeout=12):
+            if result == DEFERRED:
+                stats['deferred'] += 1  # pending hi rehne do, agle run mein
+                continue
+            site_counts = detail_stats[data.get('site')]
+            site_counts['detail_tries'] += 1
+            if result:
+                site_counts['detail_hits'] += 1
+                updates[collection][doc_id] = {'lastDate': result, 'enrichment': ENRICHMENT_DONE}
+                stats['filled'] += 1
+                continue
+            attempts = data.get('enrichment_attempts', 0) + 1
+            exhausted = attempts >= BACKFILL_MAX_ATTEMPTS
+            updates[collection][doc_id] = {
+                'enrichment_attempts': attempts,
+                'enrichment': ENRICHMENT_FAILED if exhausted else ENRICHMENT_PENDING,
+            }
+            stats['failed' if exhausted else 'retry'] += 1
+
+        for collection, docs in updates.items():
+            store.bulk_upsert(collection, docs)
+
+    stats['deferred'] += len(queue)
+    _save_site_stats(store, site_stats, detail_stats)
+    logger.info(
+        f"Backfill: filled {stats['filled']}, will retry {stats['retry']}, "
+        f"gave up on {stats['failed']}, deferred {stats['deferred']} to next run"
+    )
+    return stats
+
+
+if __name__ == "__main__":
+    # auto_scrape se logging, Firebase init (lazy) aur state collections
+    from auto_scrape import STATES, store
+
+    with ParsePool(budget=RunBudget(BACKFILL_BUDGET_SECONDS), breaker=CircuitBreaker()) as pool:
+        backfill_last_dates(store, [f'govt_jobs_{state}' for state in STATES], pool)
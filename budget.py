@@ -0,0 +1,56 @@
+# budget.py
+# Run-level time budget + per-host circuit breaker
+# Ek slow ya down host poore run ko rok na sake:
+#   RUN_BUDGET_SECONDS      - poore scrape run ka deadline (default 600)
+#   HOST_FAILURE_THRESHOLD  - itne lagataar timeouts/5xx ke baad host ko is run mein chhod do (default 3)
+
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+RUN_BUDGET_SECONDS = float(os.getenv('RUN_BUDGET_SECONDS', '600'))
+HOST_FAILURE_THRESHOLD = int(os.getenv('HOST_FAILURE_THRESHOLD', '3'))
+MIN_REQUEST_SECONDS = 2  # isse kam time bacha ho to request shuru hi mat karo
+
+
+class RunBudget:
+    def __init__(self, seconds=RUN_BUDGET_SECONDS):
+        self.deadline = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.deadline - time.monotonic())
+
+    def expired(self):
+        return self.remaining() < MIN_REQUEST_SECONDS
+
+    def timeout(self, default):
+        """Request timeout clamped so no single request runs past the deadline"""
+        return min(default, self.remaining())
+
+
+class CircuitBreaker:
+    """Counts consecutive timeouts / 5xx per host; once open, the host is skipped for this run"""
+
+    def __init__(self, threshold=HOST_FAILURE_THRESHOLD):
+        self.threshold = threshold
+        self.failures = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def host(url):
+        return urlparse(url).netloc
+
+    def allow(self, url):
+        with self.lock:
+            return self.failures.get(self.host(url), 0) < self.threshold
+
+    def record_success(self, url):
+        with self.lock:
+            self.failures[self.host(url)] = 0
+
+    def record_failure(self, url):
+        with self.lock:
+            host = self.host(url)
+            self.failures[host] = self.failures.get(host, 0) + 1
+            return self.failures[host] == self.threshold
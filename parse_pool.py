@@ -0,0 +1,154 @@
+# parse_pool.py
+# Fetch (network, threads) aur parse (CPU, processes) ko overlap karta hai
+# Fetcher threads raw bytes laate hain -> process pool mein parse -> chhote picklable records wapas
+#   FETCH_WORKERS  - kitne HTTP requests ek saath (default 6)
+#   PARSE_WORKERS  - kitne parser processes (default = CPU cores)
+# Optional RunBudget / CircuitBreaker (budget.py): deadline ya band host wale URLs
+# fetch hi nahi hote, unka result DEFERRED aata hai taaki caller unhe agle run ke liye rakh sake
+# Conditional GET: task ke saath If-None-Match / If-Modified-Since headers bhej sakte ho,
+# 304 aaye to content NOT_MODIFIED aata hai (parse ki zaroorat nahi)
+
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import requests
+
+FETCH_WORKERS = int(os.getenv('FETCH_WORKERS', '6'))
+PARSE_WORKERS = int(os.getenv('PARSE_WORKERS', str(os.cpu_count() or 2)))
+
+logger = logging.getLogger(__name__)
+
+# Budget khatam / host ka breaker open - yeh kaam is run mein nahi hua
+DEFERRED = 'deferred'
+# Conditional GET pe 304 - pichhle run ke baad kuch nahi badla
+NOT_MODIFIED = 'not-modified'
+
+
+def fetch_bytes(url, headers, timeout):
+    response = requests.get(url, headers=headers, timeout=timeout)
+    validators = {'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified')}
+    return response.status_code, response.content, validators
+
+
+class ParsePool:
+    """Producer/consumer pipeline: fetcher threads feed raw HTML to a pool of parser processes"""
+
+    def __init__(self, fetch_workers=FETCH_WORKERS, parse_workers=PARSE_WORKERS, budget=None, breaker=None):
+        self.fetch_workers = fetch_workers
+        self.parse_workers = parse_workers
+        self.budget = budget
+        self.breaker = breaker
+        self.fetchers = None
+        self.parsers = None
+
+    def __enter__(self):
+        self.fetchers = ThreadPoolExecutor(max_workers=self.fetch_workers)
+        self.parsers = ProcessPoolExecutor(max_workers=self.parse_workers)
+        # Workers abhi start kar lo - baad mein Firebase/gRPC threads ke beech fork karna safe nahi
+        self.parsers.submit(int).result()
+        return self
+
+    def __exit__(self, *exc):
+        self.fetchers.shutdown(wait=True, cancel_futures=True)
+        self.parsers.shutdown(wait=True, cancel_futures=True)
+        return False
+
+    def _submit_fetch(self, url, headers, timeout):
+        if (self.budget and self.budget.expired()) or (self.breaker and not self.breaker.allow(url)):
+            skipped = Future()
+            skipped.set_result(DEFERRED)
+            return skipped
+        if self.budget:
+            timeout = self.budget.timeout(timeout)
+        return self.fetchers.submit(fetch_bytes, url, headers, timeout)
+
+    def _record_failure(self, url):
+        if self.breaker and self.breaker.record_failure(url):
+            logger.warning(f"Circuit open for {self.breaker.host(url)}, skipping it for the rest of this run")
+
+    def fetch_stream(self, tasks, headers, timeout, validators=None):
+        """tasks: iterable of (key, url, extra_args) or (key, url, extra_args, task_headers).
+        Yields (key, url, extra_args, html_bytes) as fetches finish; html_bytes is None if the
+        fetch failed, DEFERRED if it was skipped (budget/breaker), NOT_MODIFIED on a 304.
+        If `validators` is a dict, ETag / Last-Modified of each response are stored in it by key.
+        Tasks are pulled lazily, only a few requests are in flight at a time."""
+        def submit(task):
+            task_headers = {**headers, **task[3]} if len(task) > 3 else headers
+            return self._submit_fetch(task[1], task_headers, timeout)
+
+        for (key, url, extra_args, *_), future in _windowed(submit, tasks, self.fetch_workers * 2):
+            content = None
+            try:
+                result = future.result()
+                if result == DEFERRED:
+                    content = DEFERRED
+                else:
+                    status, content, response_validators = result
+                    if status >= 500:
+                        self._record_failure(url)
+                    elif self.breaker:
+                        self.breaker.record_success(url)
+                    if validators is not None and status == 200:
+                        validators[key] = response_validators
+                    if status == 304:
+                        content = NOT_MODIFIED
+                    elif status != 200:
+                        logger.warning(f"{url} returned {status}")
+                        content = None
+            except (requests.Timeout, requests.ConnectionError) as e:
+                self._record_failure(url)
+                logger.error(f"Fetch error for {url}: {e}")
+            except Exception as e:
+                logger.error(f"Fetch error for {url}: {e}")
+            yield key, url, extra_args, content
+
+    def parse_stream(self, items, parse_func):
+        """items: iterable of (key, url, extra_args, html_bytes); parse_func(html_bytes, *extra_args)
+        must be a top-level function. Yields (key, result) as soon as each parse finishes;
+        result is None if the fetch or parse failed, DEFERRED / NOT_MODIFIED passed through as is."""
+        unparsed = []
+
+        def fetched(items):
+            for item in items:
+                if isinstance(item[3], bytes):
+                    yield item
+                else:
+                    unparsed.append((item[0], item[3]))
+
+        # Parse process mein chala gaya, fetcher thread agla URL le sakta hai
+        submit = lambda item: self.parsers.submit(parse_func, item[3], *item[2])
+        for (key, url, _, _), future in _windowed(submit, fetched(items), self.parse_workers * 2):
+            while unparsed:
+                yield unparsed.pop()
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.error(f"Parse error for {url}: {e}")
+                result = None
+            yield key, result
+        while unparsed:
+            yield unparsed.pop()
+
+    def fetch_and_parse(self, tasks, parse_func, headers, timeout):
+        return self.parse_stream(self.fetch_stream(tasks, headers, timeout), parse_func)
+
+
+def _windowed(submit, items, window):
+    """Submit items lazily with at most `window` futures in flight; yield (item, future) as they finish"""
+    items = iter(items)
+    in_flight = {}
+    exhausted = False
+    while True:
+        while not exhausted and len(in_flight) < window:
+            try:
+                item = next(items)
+            except StopIteration:
+                exhausted = True
+                break
+            in_flight[submit(item)] = item
+        if not in_flight:
+            return
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield in_flight.pop(future), future
@@ -0,0 +1,58 @@
+# parsers.py
+# Pure parsing functions - koi network ya Firebase nahi
+# Process pool workers inhe call karte hain, isliye sab top-level aur picklable hai:
+# input raw HTML bytes, output chhote records (job dicts / datetime)
+
+import html as html_lib
+import re
+from datetime import datetime
+
+from bs4 import BeautifulSoup
+
+def parse_date_str(date_str):
+    formats = [
+        '%d.%m.%Y', '%d-%m-%Y', '%d/%m/%Y',
+        '%d.%m.%y', '%d-%m-%y', '%d/%m/%y',
+        '%d %b %Y', '%d %B %Y', '%d %b, %Y', '%d %B, %Y'
+    ]
+    for fmt in formats:
+        try:
+            dt = datetime.strptime(date_str, fmt)
+            if dt.year < 2000:
+                dt = dt.replace(year=dt.year + 2000)
+            return dt
+        except ValueError:
+            continue
+    return None
+
+def extract_last_date_from_text(text):
+    patterns = [
+        r'(?:Last Date|Closing Date|Application Last Date|Last Date for Apply|Deadline|Last Date to Apply)[\s:.-]*(\d{1,2}[./-]\d{1,2}[./-]\d{2,4})',
+        r'(?:Last Date|Closing Date)[\s:.-]*(\d{1,2}\s+[A-Za-z]+\s+\d{4})',
+        r'(\d{1,2}[./-]\d{1,2}[./-]\d{2,4})'
+    ]
+    for pattern in patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            date_str = match.group(1).strip()
+            dt = parse_date_str(date_str)
+            if dt:
+                return dt
+    return None
+
+def parse_detail_date(html):
+    """Find the last date on a detail page; returns datetime or None"""
+    soup = BeautifulSoup(html, 'html.parser')
+    full_text = soup.get_text(separator=' ', strip=True)
+    return extract_last_date_from_text(full_text)
+
+def feed_content_date(content):
+    """Last date from a feed item's HTML body - tags regex se hatao, poora soup banane ki zaroorat nahi"""
+    text = html_lib.unescape(re.sub(r'<[^>]+>', ' ', content))
+    return extract_last_date_from_text(text)
+
+def parse_listing(html, site, *args):
+    """Extract jobs from a site's listing page (or feed) as small {'title', 'link', 'site'} dicts;
+    site is a site_registry.SiteMatcher (picklable, so it travels to the worker).
+    Extra args go to site.parse - feed sites take `since` (newest pubDate already ingested)"""
+    return site.parse(html, *args)
@@ -0,0 +1,128 @@
+# pipeline.py
+# Streaming ingest pipeline: har stage ek generator hai, apne thread mein chalta hai,
+# aur agle stage se bounded queue se juda hai - queue bhari to upstream ruk jaata hai (backpressure)
+#   fetch -> parse -> classify -> dedupe -> enrich -> write
+# Memory fixed rehti hai chahe kitne bhi sources hon
+#   PIPELINE_QUEUE_SIZE - har stage ke beech kitne items buffer (default 32)
+
+import os
+import queue
+import threading
+from itertools import islice
+
+PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', '32'))
+DEDUPE_BATCH_SIZE = 50
+WRITE_BATCH_SIZE = 50
+PUT_POLL_SECONDS = 0.5  # pump itni der mein check karta hai ki consumer abhi bhi hai ya nahi
+
+_DONE = object()
+
+
+class _StageError:
+    def __init__(self, exc):
+        self.exc = exc
+
+
+def _threaded(stream, maxsize, stopped):
+    """Run a generator in a background thread, handing items over through a bounded queue.
+    Once `stopped` is set (consumer gone) the pump thread stops instead of blocking on a full queue"""
+    q = queue.Queue(maxsize=maxsize)
+
+    def put(item):
+        # Bhari queue pe hamesha ke liye mat atko - consumer chala gaya ho to chhod do
+        while not stopped.is_set():
+            try:
+                q.put(item, timeout=PUT_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def pump():
+        try:
+            for item in stream:
+                if not put(item):
+                    return
+        except BaseException as e:
+            put(_StageError(e))
+            return
+        finally:
+            # Upstream stages (aur unke threads) ko bhi band karo
+            close = getattr(stream, 'close', None)
+            if close:
+                close()
+        put(_DONE)
+
+    threading.Thread(target=pump, daemon=True).start()
+    try:
+        while True:
+            item = q.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _StageError):
+                raise item.exc
+            yield item
+    finally:
+        stopped.set()
+
+
+def chain(source, *stages, maxsize=PIPELINE_QUEUE_SIZE):
+    """Connect source -> stage -> stage ...; each stage is a function taking an iterator and yielding items.
+    When the caller is done with the result (exhausted, error, close) every stage thread is stopped"""
+    stops = [threading.Event() for _ in range(len(stages) + 1)]
+    stream = _threaded(iter(source), maxsize, stops[0])
+    for stage, stopped in zip(stages, stops[1:]):
+        stream = _threaded(stage(stream), maxsize, stopped)
+    return _stop_all(stream, stops)
+
+
+def _stop_all(stream, stops):
+    try:
+        yield from stream
+    finally:
+        # Beech ka stage jaldi ruk gaya (islice / error) to upstream threads queue pe atke na rahein
+        for stopped in stops:
+            stopped.set()
+
+
+def batched(items, size):
+    items = iter(items)
+    while True:
+        batch = list(islice(items, size))
+        if not batch:
+            return
+        yield batch
+
+
+# ================== SHARED STAGES ==================
+# Items in stages ke beech: {'collection': ..., 'doc_id': ..., 'data': {...}}
+
+def dedupe(items, store, stats, batch_size=DEDUPE_BATCH_SIZE):
+    """Drop jobs already stored (one bulk_exists per collection per batch) or already seen this run"""
+    seen = set()
+    for batch in batched(items, batch_size):
+        by_collection = {}
+        for item in batch:
+            if item['doc_id'] in seen:
+                stats['duplicates'] += 1
+                continue
+            seen.add(item['doc_id'])
+            by_collection.setdefault(item['collection'], {})[item['doc_id']] = item
+        for collection, pending in by_collection.items():
+            docs = {doc_id: item['data'] for doc_id, item in pending.items()}
+            existing = store.bulk_exists(collection, docs, legacy_match=True)
+            stats['duplicates'] += len(existing)
+            for doc_id, item in pending.items():
+                if doc_id not in existing:
+                    yield item
+
+
+def write(items, store, stats, batch_size=WRITE_BATCH_SIZE):
+    """Bulk upsert items per collection; yields every item once it is stored"""
+    for batch in batched(items, batch_size):
+        by_collection = {}
+        for item in batch:
+            by_collection.setdefault(item['collection'], {})[item['doc_id']] = item['data']
+        for collection, docs in by_collection.items():
+            stats['saved'] += store.bulk_upsert(collection, docs)
+        yield from batch
@@ -0,0 +1,110 @@
+# retention.py
+# Expired jobs/videos ki safai - warna govt_jobs_* collections hamesha badhte rahenge
+# Scrape ke BAAD chalta hai, per-run time budget ke saath (scrape kabhi late nahi hoga)
+
+import logging
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger(__name__)
+
+# ================== CONFIG ==================
+# 'archive' = <collection>_archive mein copy karke hatao (default), 'delete' = seedha hatao
+RETENTION_MODE = os.getenv('RETENTION_MODE', 'archive')
+RETENTION_BUDGET_SECONDS = float(os.getenv('RETENTION_BUDGET_SECONDS', '60'))
+
+# lastDate ke baad kitne din tak job rakhna hai
+JOB_GRACE_DAYS = int(os.getenv('RETENTION_JOB_GRACE_DAYS', '1'))
+# lastDate andaaza hai (page ki pehli date bhi ho sakti hai) - isse naye scraped jobs lastDate se nahi hatenge
+JOB_MIN_AGE_DAYS = int(os.getenv('RETENTION_JOB_MIN_AGE_DAYS', '14'))
+# Jin jobs ka lastDate nahi mila, woh scraped_at se itne din baad hatenge
+JOB_MAX_AGE_DAYS = int(os.getenv('RETENTION_JOB_MAX_AGE_DAYS', '90'))
+VIDEO_MAX_AGE_DAYS = int(os.getenv('RETENTION_VIDEO_MAX_AGE_DAYS', '30'))
+
+PAGE_SIZE = 200
+BATCH_LIMIT = 500  # Firestore ek batch mein max 500 writes leta hai
+
+
+def sweep_collection(db, collection, field, cutoff, deadline, mode=RETENTION_MODE, skip_if_field=None,
+                     scraped_before=None):
+    """Page through docs with field < cutoff (cursor based) and delete/archive them in batches;
+    with scraped_before, docs scraped at/after it are kept"""
+    archive = db.collection(f'{collection}_archive') if mode == 'archive' else None
+    query = db.collection(collection).where(field, '<', cutoff).order_by(field).limit(PAGE_SIZE)
+    last_doc = None
+    removed = 0
+
+    while time.monotonic() < deadline:
+        page = query.start_after(last_doc) if last_doc else query
+        docs = list(page.stream())
+        if not docs:
+            break
+
+        batch = db.batch()
+        ops = 0
+        for doc in docs:
+            data = doc.to_dict()
+            # e.g. purani job jiska lastDate abhi aage hai - use lastDate wala pass sambhalega
+            if skip_if_field and data.get(skip_if_field):
+                continue
+            # Firestore do fields pe range filter nahi deta (bina index) - yeh check yahin
+            if scraped_before and data.get('scraped_at') and data['scraped_at'] >= scraped_before:
+                continue
+            if archive is not None:
+                batch.set(archive.document(doc.id), data)
+                ops += 1
+            batch.delete(doc.reference)
+            ops += 1
+            removed += 1
+            if ops >= BATCH_LIMIT - 1:
+                batch.commit()
+                batch = db.batch()
+                ops = 0
+        if ops:
+            batch.commit()
+
+        if len(docs) < PAGE_SIZE:
+            break
+        last_doc = docs[-1]
+    else:
+        logger.warning(f"Retention budget khatam, {collection} baaki next run mein")
+
+    return removed
+
+
+def sweep_expired_jobs(db, collections, budget_seconds=RETENTION_BUDGET_SECONDS, mode=RETENTION_MODE):
+    """Remove jobs whose lastDate has passed (or too old without lastDate)"""
+    deadline = time.monotonic() + budget_seconds
+    now = datetime.now(timezone.utc)
+    expired_cutoff = now - timedelta(days=JOB_GRACE_DAYS)
+    stale_cutoff = now - timedelta(days=JOB_MAX_AGE_DAYS)
+    min_age_cutoff = now - timedelta(days=JOB_MIN_AGE_DAYS)
+    total = 0
+
+    for collection in collections:
+        try:
+            total += sweep_collection(db, collection, 'lastDate', expired_cutoff, deadline, mode,
+                                      scraped_before=min_age_cutoff)
+            total += sweep_collection(db, collection, 'scraped_at', stale_cutoff, deadline, mode,
+                                      skip_if_field='lastDate')
+        except Exception as e:
+            logger.error(f"Retention error for {collection}: {e}")
+        if time.monotonic() >= deadline:
+            break
+
+    logger.info(f"Retention ({mode}): removed {total} expired jobs")
+    return total
+
+
+def sweep_old_videos(db, collection, budget_seconds=RETENTION_BUDGET_SECONDS, mode=RETENTION_MODE):
+    """Remove videos scraped more than VIDEO_MAX_AGE_DAYS ago"""
+    deadline = time.monotonic() + budget_seconds
+    cutoff = datetime.now(timezone.utc) - timedelta(days=VIDEO_MAX_AGE_DAYS)
+    try:
+        total = sweep_collection(db, collection, 'scrapedAt', cutoff, deadline, mode)
+    except Exception as e:
+        logger.error(f"Retention error for {collection}: {e}")
+        return 0
+    logger.info(f"Retention ({mode}): removed {total} old videos from {collection}")
+    return total
@@ -0,0 +1,188 @@
+# site_registry.py
+# Saari sites ek jagah - sites.json (ya PASRA_SITES_FILE) se load hoti hain
+# Nayi site add karni ho to sirf JSON mein entry daalo, code chhune ki zaroorat nahi
+#
+# Site entry fields:
+#   name, url          - required
+#   type               - "listing" (default, HTML page) ya "feed" (WordPress RSS/Atom)
+#   feed_url           - feed sites ke liye, default url + "feed/"
+#   base_url           - relative links ke aage lagta hai
+#   link_selector      - CSS selector for job <a> tags
+#   item_selector      - optional: har matching item (e.g. "li") mein sirf pehla link_selector match lo,
+#                        taaki "Apply Online" / "Notification" jaise secondary links alag job na banein
+#   section            - optional: {"heading": css, "heading_text": text, "container": tag}
+#                        heading milne ke baad agle container ke andar hi links dhundho
+#   keywords           - title (lowercase) mein inme se ek hona chahiye (empty = sab chalega)
+#   min_title_length   - default 16
+#   limit              - max jobs per run from this site (sirf listing sites; feeds incremental hain)
+
+import html as html_lib
+import io
+import json
+import os
+import re
+import zlib
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urljoin
+from xml.etree import ElementTree
+
+from bs4 import BeautifulSoup
+
+from parsers import feed_content_date
+
+SITES_FILE = os.getenv('PASRA_SITES_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sites.json'))
+
+
+class SiteMatcher:
+    """One registry entry, compiled once into selectors + a keyword regex"""
+
+    def __init__(self, spec):
+        self.name = spec['name']
+        self.url = spec['url']
+        self.fetch_url = self.url
+        self.base_url = spec.get('base_url', spec['url'])
+        self.link_selector = spec.get('link_selector', 'a[href]')
+        self.item_selector = spec.get('item_selector')
+        self.section = spec.get('section')
+        self.min_title_length = spec.get('min_title_length', 16)
+        self.limit = spec.get('limit')
+        keywords = [kw.lower() for kw in spec.get('keywords', [])]
+        self.keyword_re = re.compile('|'.join(map(re.escape, keywords))) if keywords else None
+
+    def __repr__(self):
+        return f"SiteMatcher({self.name!r})"
+
+    def matches(self, title):
+        if len(title) < self.min_title_length:
+            return False
+        return self.keyword_re is None or self.keyword_re.search(title.lower()) is not None
+
+    def _scope(self, soup):
+        if not self.section:
+            return soup
+        heading_text = self.section['heading_text']
+        for heading in soup.select(self.section['heading']):
+            if heading_text in heading.get_text(strip=True):
+                return heading.find_next(self.section['container'])
+        return None
+
+    def _links(self, scope):
+        if not self.item_selector:
+            return scope.select(self.link_selector)
+        links = (item.select_one(self.link_selector) for item in scope.select(self.item_selector))
+        return [a for a in links if a is not None]
+
+    def parse(self, html):
+        """Extract {'title', 'link', 'site'} dicts from a listing page"""
+        soup = BeautifulSoup(html, 'html.parser')
+        scope = self._scope(soup)
+        jobs = []
+        if scope is None:
+            return jobs
+        for a in self._links(scope):
+            title = a.text.strip()  # pehle jaisa a.text - stored titles aur doc ids same rahein
+            if not self.matches(title):
+                continue
+            jobs.append({'title': title, 'link': urljoin(self.base_url, a['href']), 'site': self.name})
+            if self.limit and len(jobs) >= self.limit:
+                break
+        return jobs
+
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+CONTENT_ENCODED = '{http://purl.org/rss/1.0/modules/content/}encoded'
+FEED_ITEM_TAGS = ('item', ATOM + 'entry')
+FEED_BODY_TAGS = (CONTENT_ENCODED, 'description', ATOM + 'content', ATOM + 'summary')
+
+
+def _item_text(item, *tags):
+    for tag in tags:
+        text = item.findtext(tag)
+        if text:
+            return text
+    return ''
+
+
+def _item_link(item):
+    link = item.findtext('link')
+    if link:
+        return link.strip()
+    for atom_link in item.findall(ATOM + 'link'):
+        if atom_link.get('rel', 'alternate') == 'alternate':
+            return atom_link.get('href')
+    return None
+
+
+def _item_published(item):
+    """RSS pubDate (RFC 822) ya Atom published/updated (ISO) -> aware datetime, None if missing/bad"""
+    try:
+        pub_date = item.findtext('pubDate')
+        if pub_date:
+            published = parsedate_to_datetime(pub_date.strip())
+        else:
+            stamp = _item_text(item, ATOM + 'published', ATOM + 'updated').strip()
+            if not stamp:
+                return None
+            published = datetime.fromisoformat(stamp.replace('Z', '+00:00'))
+    except (TypeError, ValueError):
+        return None
+    return published if published.tzinfo else published.replace(tzinfo=timezone.utc)
+
+
+class FeedSite(SiteMatcher):
+    """WordPress RSS/Atom feed - title, link, pubDate aur aksar post body bhi ek hi request mein"""
+
+    def __init__(self, spec):
+        super().__init__(spec)
+        self.fetch_url = spec.get('feed_url') or urljoin(self.url, 'feed/')
+
+    def __repr__(self):
+        return f"FeedSite({self.name!r})"
+
+    def parse(self, xml, since=None):
+        """Job dicts for items published after `since` (ISO string). Items are read one by one
+        with iterparse, no full tree; each job has 'published' and 'lastDate' if the body had one.
+        No `limit` here - every item newer than `since` is returned, so none falls below the next cutoff"""
+        since = datetime.fromisoformat(since) if since else None
+        jobs = []
+        for _, item in ElementTree.iterparse(io.BytesIO(xml)):
+            if item.tag not in FEED_ITEM_TAGS:
+                continue
+            published = _item_published(item)
+            if since and published and published <= since:
+                break  # WordPress feed newest-first hota hai - aage sab pehle ka hai
+            title = html_lib.unescape(_item_text(item, 'title', ATOM + 'title')).strip()
+            link = _item_link(item)
+            body = _item_text(item, *FEED_BODY_TAGS)
+            item.clear()
+            if not link or not self.matches(title):
+                continue
+            job = {'title': title, 'link': urljoin(self.base_url, link), 'site': self.name, 'published': published}
+            # Post body mein hi last date ho to detail page fetch karne ki zaroorat nahi
+            last_date = feed_content_date(body) if body else None
+            if last_date:
+                job['lastDate'] = last_date
+            jobs.append(job)
+        return jobs
+
+
+SITE_TYPES = {'listing': SiteMatcher, 'feed': FeedSite}
+
+
+def load_sites(path=SITES_FILE):
+    with open(path, encoding='utf-8') as f:
+        return [SITE_TYPES[spec.get('type', 'listing')](spec) for spec in json.load(f)]
+
+
+def parse_shard(value):
+    """'2/4' -> (2, 4); shards are 1-based"""
+    index, total = (int(part) for part in value.split('/'))
+    if total < 1 or not 1 <= index <= total:
+        raise ValueError(f"Invalid shard {value!r}, expected i/N with 1 <= i <= N")
+    return index, total
+
+
+def shard_sites(sites, index, total):
+    """Stable split by site name, so a site always lands on the same worker"""
+    return [site for site in sites if zlib.crc32(site.name.encode('utf-8')) % total == index - 1]
@@ -0,0 +1,259 @@
+# storage.py
+# Storage backends for PASRA scrapers
+# Ingest code sirf is interface se baat karta hai - Firestore (production) ya SQLite (local/dry run)
+#   PASRA_STORAGE=firestore  -> Firestore (default)
+#   PASRA_STORAGE=sqlite     -> local SQLite file (PASRA_SQLITE_PATH, default pasra_local.db)
+#   PASRA_STORAGE=dry-run    -> kuch save nahi hota, Firebase import bhi nahi hota
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+
+STORAGE_BACKEND = os.getenv('PASRA_STORAGE', 'firestore')
+SQLITE_PATH = os.getenv('PASRA_SQLITE_PATH', 'pasra_local.db')
+LEASE_COLLECTION = 'scrape_leases'
+
+# Backend-neutral marker; har backend isko apne "abhi ka time" mein badalta hai
+SERVER_TIMESTAMP = object()
+
+
+def job_doc_id(title, link):
+    """Stable document id for a job, so the same job always maps to the same doc"""
+    return hashlib.sha1(f"{title}\n{link}".encode('utf-8')).hexdigest()
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class Storage:
+    """Bulk storage interface. `docs` is always a dict of {doc_id: data}."""
+
+    def bulk_exists(self, collection, docs, legacy_match=False):
+        """Return the set of doc ids from `docs` that are already stored. legacy_match=True also
+        matches old auto-ID docs by link + title (sirf govt_jobs_* collections mein aise docs hain)"""
+        raise NotImplementedError
+
+    def bulk_upsert(self, collection, docs, merge=True):
+        """Write all `docs`, merging into existing ones; returns number written"""
+        raise NotImplementedError
+
+    def fetch(self, collection, limit=None, where=None):
+        """Return up to `limit` docs as {doc_id: data}; where=(field, value) filters on equality"""
+        raise NotImplementedError
+
+    def acquire_lease(self, name, owner, ttl_seconds):
+        """Atomically claim `name` for `owner` unless someone else holds an unexpired lease"""
+        raise NotImplementedError
+
+    def release_lease(self, name, owner):
+        raise NotImplementedError
+
+
+class FirestoreStorage(Storage):
+    GET_ALL_CHUNK = 100
+    IN_QUERY_LIMIT = 30  # Firestore 'in' filter max 30 values leta hai
+    BATCH_LIMIT = 500
+
+    def __init__(self, db_factory):
+        # Client pehli zaroorat pe banta hai - import/startup pe Firebase ka kharcha nahi
+        self._db_factory = db_factory
+        self._db = None
+        self._init_lock = threading.Lock()
+        self._server_timestamp = None
+
+    @property
+    def db(self):
+        if self._db is None:
+            with self._init_lock:
+                if self._db is None:
+                    from firebase_admin import firestore
+                    self._server_timestamp = firestore.SERVER_TIMESTAMP
+                    self._db = self._db_factory()
+        return self._db
+
+    def bulk_exists(self, collection, docs, legacy_match=False):
+        col = self.db.collection(collection)
+        found = set()
+        for chunk in _chunks(list(docs), self.GET_ALL_CHUNK):
+            for snap in self.db.get_all([col.document(doc_id) for doc_id in chunk]):
+                if snap.exists:
+                    found.add(snap.id)
+        if not legacy_match:
+            return found
+
+        # Purane docs auto-ID (.add()) se bane the - unko link + title se match karo
+        by_link = {}
+        for doc_id, data in docs.items():
+            if doc_id not in found and data.get('link'):
+                by_link.setdefault(data['link'], []).append(doc_id)
+        for chunk in _chunks(list(by_link), self.IN_QUERY_LIMIT):
+            for snap in col.where('link', 'in', chunk).stream():
+                stored = snap.to_dict()
+                for doc_id in by_link.get(stored.get('link'), []):
+                    if docs[doc_id].get('title') == stored.get('title'):
+                        found.add(doc_id)
+        return found
+
+    def bulk_upsert(self, collection, docs, merge=True):
+        col = self.db.collection(collection)
+        items = list(docs.items())
+        for chunk in _chunks(items, self.BATCH_LIMIT):
+            batch = self.db.batch()
+            for doc_id, data in chunk:
+                batch.set(col.document(doc_id), self._prepare(data), merge=merge)
+            batch.commit()
+        return len(items)
+
+    def fetch(self, collection, limit=None, where=None):
+        query = self.db.collection(collection)
+        if where:
+            query = query.where(where[0], '==', where[1])
+        if limit:
+            query = query.limit(limit)
+        return {snap.id: snap.to_dict() for snap in query.stream()}
+
+    def acquire_lease(self, name, owner, ttl_seconds):
+        from firebase_admin import firestore
+        ref = self.db.collection(LEASE_COLLECTION).document(name)
+
+        @firestore.transactional
+        def claim(transaction):
+            now = datetime.now(timezone.utc)
+            snap = ref.get(transaction=transaction)
+            lease = snap.to_dict() if snap.exists else None
+            if lease and lease.get('owner') != owner and lease.get('expires_at') and lease['expires_at'] > now:
+                return False
+            transaction.set(ref, {'owner': owner, 'expires_at': now + timedelta(seconds=ttl_seconds)})
+            return True
+
+        return claim(self.db.transaction())
+
+    def release_lease(self, name, owner):
+        ref = self.db.collection(LEASE_COLLECTION).document(name)
+        snap = ref.get()
+        if snap.exists and snap.to_dict().get('owner') == owner:
+            ref.delete()
+
+    def _prepare(self, data):
+        return {k: (self._server_timestamp if v is SERVER_TIMESTAMP else v) for k, v in data.items()}
+
+
+class SQLiteStorage(Storage):
+    """Local single-file backend - network nahi chahiye, dry runs aur benchmarking ke liye"""
+
+    SQL_VARS_LIMIT = 500
+
+    def __init__(self, path=SQLITE_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        with self.lock, self.conn:
+            self.conn.execute(
+                'CREATE TABLE IF NOT EXISTS docs ('
+                'collection TEXT NOT NULL, id TEXT NOT NULL, data TEXT NOT NULL, '
+                'PRIMARY KEY (collection, id))'
+            )
+
+    def _load(self, collection, doc_ids):
+        rows = {}
+        for chunk in _chunks(list(doc_ids), self.SQL_VARS_LIMIT):
+            placeholders = ','.join('?' * len(chunk))
+            cur = self.conn.execute(
+                f'SELECT id, data FROM docs WHERE collection = ? AND id IN ({placeholders})',
+                [collection, *chunk],
+            )
+            rows.update((doc_id, json.loads(data)) for doc_id, data in cur)
+        return rows
+
+    def bulk_exists(self, collection, docs, legacy_match=False):
+        with self.lock:
+            return set(self._load(collection, docs))
+
+    def bulk_upsert(self, collection, docs, merge=True):
+        now = datetime.now(timezone.utc).isoformat()
+        with self.lock, self.conn:
+            existing = self._load(collection, docs) if merge else {}
+            rows = []
+            for doc_id, data in docs.items():
+                merged = dict(existing.get(doc_id, {}))
+                merged.update({k: (now if v is SERVER_TIMESTAMP else v) for k, v in data.items()})
+                rows.append((collection, doc_id, json.dumps(merged, default=_json_default)))
+            self.conn.executemany(
+                'INSERT INTO docs (collection, id, data) VALUES (?, ?, ?) '
+                'ON CONFLICT (collection, id) DO UPDATE SET data = excluded.data',
+                rows,
+            )
+        return len(rows)
+
+    def fetch(self, collection, limit=None, where=None):
+        sql = 'SELECT id, data FROM docs WHERE collection = ?'
+        params = [collection]
+        if where:
+            sql += ' AND json_extract(data, ?) = ?'
+            params += [f'$.{where[0]}', where[1]]
+        if limit:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        with self.lock:
+            return {doc_id: json.loads(data) for doc_id, data in self.conn.execute(sql, params)}
+
+    def acquire_lease(self, name, owner, ttl_seconds):
+        now = datetime.now(timezone.utc)
+        with self.lock, self.conn:
+            # Dusre process bhi same file use kar sakte hain - write lock pehle hi le lo
+            self.conn.execute('BEGIN IMMEDIATE')
+            lease = self._load(LEASE_COLLECTION, [name]).get(name)
+            if lease and lease['owner'] != owner and datetime.fromisoformat(lease['expires_at']) > now:
+                return False
+            expires_at = (now + timedelta(seconds=ttl_seconds)).isoformat()
+            self.conn.execute(
+                'INSERT OR REPLACE INTO docs (collection, id, data) VALUES (?, ?, ?)',
+                (LEASE_COLLECTION, name, json.dumps({'owner': owner, 'expires_at': expires_at})),
+            )
+        return True
+
+    def release_lease(self, name, owner):
+        with self.lock, self.conn:
+            lease = self._load(LEASE_COLLECTION, [name]).get(name)
+            if lease and lease['owner'] == owner:
+                self.conn.execute('DELETE FROM docs WHERE collection = ? AND id = ?', (LEASE_COLLECTION, name))
+
+
+class DryRunStorage(Storage):
+    """Find-only mode: sab kuch naya maano, kuch likho mat"""
+
+    def bulk_exists(self, collection, docs, legacy_match=False):
+        return set()
+
+    def bulk_upsert(self, collection, docs, merge=True):
+        return len(docs)
+
+    def fetch(self, collection, limit=None, where=None):
+        return {}
+
+    def acquire_lease(self, name, owner, ttl_seconds):
+        return True
+
+    def release_lease(self, name, owner):
+        pass
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+def open_storage(db_factory, backend=None):
+    """Pick backend (default PASRA_STORAGE); db_factory is only called on first Firestore use"""
+    backend = backend or STORAGE_BACKEND
+    if backend == 'dry-run':
+        return DryRunStorage()
+    if backend == 'sqlite':
+        return SQLiteStorage(SQLITE_PATH)
+    return FirestoreStorage(db_factory)
@@ -1,11 +1,12 @@
 # yt_job_videos_link.py
 import requests
 from datetime import datetime, timedelta, timezone
-import firebase_admin
-from firebase_admin import credentials, firestore
+import argparse
 import os
 import logging
 import hashlib  # Optional duplicate ke liye extra layer
+from retention import sweep_old_videos
+from storage import SERVER_TIMESTAMP, FirestoreStorage, open_storage
 
 # ================== LOGGING SETUP ==================
 logging.basicConfig(
@@ -53,20 +54,28 @@ NEGATIVE_KEYWORDS = [
 ]
 
 # ================== FIREBASE INIT ==================
-try:
-    if 'GOOGLE_APPLICATION_CREDENTIALS' in os.environ:
-        # GitHub Actions mein env var se direct initialize
-        firebase_admin.initialize_app()
-    else:
-        # Local test ke liye file path
-        cred = credentials.Certificate(FIREBASE_KEY_PATH)
-        firebase_admin.initialize_app(cred)
-    
-    db = firestore.client()
-    logger.info("Firebase connected successfully!")
-except Exception as e:
-    logger.error(f"Firebase initialization failed: {e}")
-    raise
+# Lazy - pehli Firestore call pe hi init hoga; --dry-run mein firebase_admin import hi nahi hota
+def initialize_firebase():
+    import firebase_admin
+    from firebase_admin import credentials, firestore
+
+    try:
+        if 'GOOGLE_APPLICATION_CREDENTIALS' in os.environ:
+            # GitHub Actions mein env var se direct initialize
+            firebase_admin.initialize_app()
+        else:
+            # Local test ke liye file path
+            cred = credentials.Certificate(FIREBASE_KEY_PATH)
+            firebase_admin.initialize_app(cred)
+        
+        db = firestore.client()
+        logger.info("Firebase connected successfully!")
+        return db
+    except Exception as e:
+        logger.error(f"Firebase initialization failed: {e}")
+        raise
+
+store = open_storage(initialize_firebase)
 
 # ================== FUNCTIONS ==================
 def get_uploads_playlist(channel_id):
@@ -113,6 +122,7 @@ def fetch_and_save_latest_videos():
                 logger.warning(f"No items returned for channel {ch_id}")
                 continue
 
+            candidates = {}
             for item in resp['items']:
                 pub_date = item['snippet']['publishedAt']
                 if pub_date < yesterday_str:
@@ -126,28 +136,29 @@ def fetch_and_save_latest_videos():
                     continue
 
                 video_id = item['snippet']['resourceId']['videoId']
-                doc_ref = db.collection(COLLECTION_NAME).document(video_id)
-
-                if doc_ref.get().exists:
-                    logger.info(f"Skipped duplicate: {title}")
-                    continue
-
-                video_data = {
+                candidates[video_id] = {
                     'title': title,
                     'link': f"https://www.youtube.com/watch?v={video_id}",
                     'channel': item['snippet']['channelTitle'],
                     'channelId': ch_id,
                     'thumbnail': item['snippet']['thumbnails'].get('medium', {}).get('url', ''),
                     'publishedAt': pub_date,
-                    'scrapedAt': firestore.SERVER_TIMESTAMP,
+                    'scrapedAt': SERVER_TIMESTAMP,
                     'description': desc[:400],
                     'source': 'youtube',
                     'videoId': video_id
                 }
 
-                doc_ref.set(video_data)
-                total_saved += 1
-                logger.info(f"SAVED REAL GOVT JOB VIDEO: {title}")
+            # Channel ke saare videos ka duplicate check ek hi bulk call mein
+            existing = store.bulk_exists(COLLECTION_NAME, candidates)
+            for video_id in existing:
+                logger.info(f"Skipped duplicate: {candidates[video_id]['title']}")
+
+            new_videos = {vid: data for vid, data in candidates.items() if vid not in existing}
+            if new_videos:
+                total_saved += store.bulk_upsert(COLLECTION_NAME, new_videos)
+            for video_data in new_videos.values():
+                logger.info(f"SAVED REAL GOVT JOB VIDEO: {video_data['title']}")
                 logger.info(f"   Channel: {video_data['channel']}")
                 logger.info(f"   Link: {video_data['link']}")
                 logger.info("---")
@@ -159,8 +170,18 @@ def fetch_and_save_latest_videos():
 
 # ================== RUN ==================
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PASRA YouTube govt job videos scraper")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="Sirf videos dhundo aur log karo, kuch save nahi (Firebase import nahi hoga)")
+    args = parser.parse_args()
+    if args.dry_run:
+        store = open_storage(initialize_firebase, backend='dry-run')
+
     if not API_KEY:
         logger.error("YOUTUBE_API_KEY environment variable not set!")
         exit(1)
     
     fetch_and_save_latest_videos()
+    # Purane videos ki safai - save ke baad, time budget ke andar
+    if isinstance(store, FirestoreStorage):
+        sweep_old_videos(store.db, COLLECTION_NAME)